@@ -1,19 +1,81 @@
 import json
 import os
+import re
 import asyncio
-from datetime import datetime, timedelta
+import atexit
+import threading
+import weakref
+from datetime import date, datetime, timedelta
 from typing import Dict, Any, Optional, List
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 设置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# QQ的CQ码@格式，以及其他可能的@格式
+_CQ_AT = re.compile(r'\[CQ:at,qq=(\d+)\]')
+_AT_NUM = re.compile(r'@(\d+)')
+
+# 用户数据修改后延迟写盘的时间（秒），期间的多次修改合并为一次写入
+_FLUSH_DELAY = 2.0
+
+# 进程退出时需要写盘的UserManager实例（弱引用，插件重载后旧实例可被回收）
+_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_managers():
+    for manager in list(_managers):
+        manager.flush()
+
+# 优先使用orjson进行序列化，未安装时回退到标准库json
+if orjson is not None:
+    def _json_dumps(data: Any, pretty: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(data: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    _json_loads = json.loads
+
 class UserManager:
     def __init__(self, plugin_dir: str):
         self.plugin_dir = plugin_dir
         self.users_file = os.path.join(plugin_dir, "users.json")
         self.config_file = os.path.join(plugin_dir, "config.json")
+        # 解析结果缓存，以文件mtime判断是否失效
+        self._users_cache = None
+        self._users_mtime = -1
+        self._config_cache = None
+        self._config_mtime = -1
+        # 到期日期索引: {expire_date: [user_id, ...]}
+        self._expire_index = None
+        # 文件读写可能在线程池中并发执行，需要加锁
+        self._lock = threading.RLock()
+        # 保证写盘按顺序进行；获取顺序为先_write_lock后_lock
+        self._write_lock = threading.Lock()
+        # 内存中有尚未写盘的修改，_version在每次修改时递增
+        self._dirty = False
+        self._version = 0
+        # 在_lock内产生了需要写盘的修改，释放_lock后再安排写盘
+        self._pending_flush = False
+        self._flush_handle = None
+        self._flush_loop = None
+        self._flush_task = None
+        _managers.add(self)
         self.ensure_files()
     
     def ensure_files(self):
@@ -35,50 +97,217 @@ class UserManager:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(default_config, f, ensure_ascii=False, indent=2)
     
+    def _write_json(self, path: str, data: Dict[str, Any], pretty: bool = False):
+        """原子写入JSON文件：先写临时文件再替换，避免写入中断导致文件损坏"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_json_dumps(data, pretty))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
     def load_users(self) -> Dict[str, Any]:
         """加载用户数据"""
+        with self._lock:
+            users_data = self._load_users()
+        self._flush_pending()
+        return users_data
+    
+    def _load_users(self) -> Dict[str, Any]:
         try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # 有未写盘的修改时以内存数据为准
+            if self._dirty and self._users_cache is not None:
+                return self._users_cache
+            mtime = os.stat(self.users_file).st_mtime_ns
+            if mtime == self._users_mtime and self._users_cache is not None:
+                return self._users_cache
+            with open(self.users_file, 'rb') as f:
+                users_data = _json_loads(f.read())
+            self._users_cache = users_data
+            self._users_mtime = mtime
+            # 旧数据没有expire_ordinal字段，首次加载时补齐，释放锁后再写回
+            if self.sync_expire_ordinals(users_data):
+                self._dirty = True
+                self._version += 1
+                self._pending_flush = True
+            self._expire_index = self._build_expire_index(users_data)
+            return users_data
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"加载用户数据失败: {e}")
+            self._users_cache = None
+            self._users_mtime = -1
+            self._expire_index = None
             return {}
     
     def save_users(self, users_data: Dict[str, Any]):
         """保存用户数据"""
+        with self._write_lock:
+            with self._lock:
+                self._users_cache = users_data
+                self._expire_index = None
+                self._dirty = True
+                self._version += 1
+            self._write_dirty()
+    
+    def flush(self):
+        """将内存中未写盘的用户数据写入文件"""
+        self._cancel_flush_handle()
+        with self._write_lock:
+            self._write_dirty()
+    
+    def _write_dirty(self):
+        """写入未写盘的数据，调用方需持有_write_lock且不能持有_lock"""
+        # 只在锁内复制数据，序列化和写盘在锁外进行，避免阻塞事件循环线程
+        with self._lock:
+            if not self._dirty or self._users_cache is None:
+                return
+            snapshot = {user_id: dict(user_info) for user_id, user_info in self._users_cache.items()}
+            version = self._version
+        
         try:
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(users_data, f, ensure_ascii=False, indent=2)
+            self._write_json(self.users_file, snapshot)
+            mtime = os.stat(self.users_file).st_mtime_ns
         except Exception as e:
             logger.error(f"保存用户数据失败: {e}")
+            return
+        
+        with self._lock:
+            self._users_mtime = mtime
+            # 写盘期间没有新的修改才算写完
+            if self._version == version:
+                self._dirty = False
+    
+    def _flush_pending(self):
+        """释放_lock后调用：若锁内产生了修改则安排写盘"""
+        with self._lock:
+            pending = self._pending_flush
+            self._pending_flush = False
+        if pending:
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """延迟写盘，在事件循环外调用时立即写入"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_loop = loop
+        self._flush_handle = loop.call_later(_FLUSH_DELAY, self._start_flush)
+    
+    def _cancel_flush_handle(self):
+        """取消尚未触发的延迟写盘"""
+        handle = self._flush_handle
+        if handle is None:
+            return
+        self._flush_handle = None
+        
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        loop = self._flush_loop
+        if loop is running_loop:
+            handle.cancel()
+        elif loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(handle.cancel)
+    
+    def _start_flush(self):
+        """在线程中执行延迟写盘"""
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(asyncio.to_thread(self.flush))
+    
+    def _build_expire_index(self, users_data: Dict[str, Any]) -> Dict[str, List[str]]:
+        """按到期日期建立用户索引"""
+        index = {}
+        for user_id, user_info in users_data.items():
+            index.setdefault(user_info.get("expire_date", ""), []).append(user_id)
+        return index
+    
+    def sync_expire_ordinals(self, users_data: Dict[str, Any]) -> bool:
+        """根据expire_date补齐/校正expire_ordinal字段，返回是否有改动"""
+        changed = False
+        for user_info in users_data.values():
+            try:
+                ordinal = date.fromisoformat(user_info.get("expire_date", "")).toordinal()
+            except (TypeError, ValueError):
+                if "expire_ordinal" in user_info:
+                    del user_info["expire_ordinal"]
+                    changed = True
+                continue
+            if user_info.get("expire_ordinal") != ordinal:
+                user_info["expire_ordinal"] = ordinal
+                changed = True
+        return changed
     
     def load_config(self) -> Dict[str, Any]:
         """加载配置"""
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            mtime = os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._config_mtime and self._config_cache is not None:
+            return self._config_cache
+        
+        try:
+            with open(self.config_file, 'rb') as f:
+                config_data = _json_loads(f.read())
+            self._config_cache = config_data
+            self._config_mtime = mtime
+            return config_data
         except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"加载配置失败: {e}")
-            return {"admins": [], "reminder_enabled": True}
+            # 记录本次失败的mtime，文件未再修改前不重复读取和报错；继续使用上次成功加载的配置
+            logger.error(f"加载配置失败，继续使用上次的配置: {e}")
+            self._config_mtime = mtime
+            if self._config_cache is None:
+                self._config_cache = {"admins": [], "reminder_enabled": True}
+            return self._config_cache
     
     def save_config(self, config_data: Dict[str, Any]):
         """保存配置"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            # 配置文件需要手动编辑，保留缩进格式
+            self._write_json(self.config_file, config_data, pretty=True)
+            self._config_mtime = os.stat(self.config_file).st_mtime_ns
+            self._config_cache = config_data
         except Exception as e:
             logger.error(f"保存配置失败: {e}")
     
+    async def aload_users(self) -> Dict[str, Any]:
+        """在线程中加载用户数据，避免阻塞事件循环"""
+        return await asyncio.to_thread(self.load_users)
+    
+    async def aadd_or_update_user(self, user_id: str, username: str = None, extend_days: int = 0):
+        """添加或更新用户信息，文件读取在线程中进行，写盘延迟合并"""
+        await self.aload_users()
+        return self.add_or_update_user(user_id, username, extend_days)
+    
     def add_or_update_user(self, user_id: str, username: str = None, extend_days: int = 0):
         """添加或更新用户信息"""
-        users = self.load_users()
+        with self._lock:
+            user_info = self._add_or_update_user(user_id, username, extend_days)
+        # 在事件循环外会立即写盘，必须在释放_lock后进行
+        self._flush_pending()
+        return user_info
+    
+    def _add_or_update_user(self, user_id: str, username: str = None, extend_days: int = 0):
+        users = self._load_users()
+        # 只取一次当前日期，保证开户与到期日期基于同一时刻
+        today = date.today()
+        today_str = today.isoformat()
         
         if user_id not in users:
             # 新用户
+            expire = today + timedelta(days=extend_days) if extend_days > 0 else today
             users[user_id] = {
                 "platform_username": username or "",
-                "start_date": datetime.now().strftime("%Y-%m-%d"),
-                "expire_date": (datetime.now() + timedelta(days=extend_days)).strftime("%Y-%m-%d") if extend_days > 0 else datetime.now().strftime("%Y-%m-%d")
+                "start_date": today_str,
+                "expire_date": expire.isoformat(),
+                "expire_ordinal": expire.toordinal()
             }
         else:
             # 更新现有用户
@@ -86,30 +315,47 @@ class UserManager:
                 users[user_id]["platform_username"] = username
             if extend_days > 0:
                 try:
-                    current_expire = datetime.strptime(users[user_id]["expire_date"], "%Y-%m-%d")
+                    current_expire = date.fromisoformat(users[user_id]["expire_date"])
                     # 如果当前时间已经超过到期时间，从当前时间开始计算
-                    start_from = max(current_expire, datetime.now())
+                    start_from = max(current_expire, today)
                     new_expire = start_from + timedelta(days=extend_days)
-                    users[user_id]["expire_date"] = new_expire.strftime("%Y-%m-%d")
-                except ValueError:
+                except (KeyError, TypeError, ValueError):
                     # 如果日期格式有问题，从当前时间开始
-                    users[user_id]["expire_date"] = (datetime.now() + timedelta(days=extend_days)).strftime("%Y-%m-%d")
-        
-        self.save_users(users)
+                    new_expire = today + timedelta(days=extend_days)
+                users[user_id]["expire_date"] = new_expire.isoformat()
+                users[user_id]["expire_ordinal"] = new_expire.toordinal()
+        
+        # 只修改内存数据，稍后统一写盘
+        self._users_cache = users
+        self._expire_index = None
+        self._dirty = True
+        self._version += 1
+        self._pending_flush = True
         return users[user_id]
     
     def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
         """获取用户信息"""
-        users = self.load_users()
-        return users.get(user_id)
+        return self.load_users().get(user_id)
+    
+    def get_users_snapshot(self) -> Dict[str, Any]:
+        """获取用户数据的副本（去掉内部字段），供外部读取和修改"""
+        with self._lock:
+            users = self._load_users()
+            snapshot = {
+                user_id: {key: value for key, value in user_info.items() if key != "expire_ordinal"}
+                for user_id, user_info in users.items()
+            }
+        self._flush_pending()
+        return snapshot
     
     def get_users_by_expire_date(self, target_date: str) -> List[tuple]:
         """获取指定日期到期的用户"""
-        users = self.load_users()
-        result = []
-        for user_id, user_info in users.items():
-            if user_info.get("expire_date") == target_date:
-                result.append((user_id, user_info))
+        with self._lock:
+            users = self._load_users()
+            if self._expire_index is None:
+                self._expire_index = self._build_expire_index(users)
+            result = [(user_id, users[user_id]) for user_id in self._expire_index.get(target_date, [])]
+        self._flush_pending()
         return result
     
     def get_expiring_users(self, days_before: int = 3) -> List[tuple]:
@@ -138,48 +384,80 @@ class UserManagementPlugin:
         self.plugin_dir = os.path.dirname(os.path.abspath(__file__))
         self.user_manager = UserManager(self.plugin_dir)
         
-        # 加载配置
-        self.config = self.user_manager.load_config()
-        self.admins = self.config.get("admins", [])
-        self.group_id = self.config.get("group_id", "")
+        # 配置在首次使用时才加载，管理员集合随配置对象变化重建
+        self._admin_set_config = None
+        self._admin_set_cache = frozenset()
         
         # 提醒任务状态
         self.reminder_task_running = False
+        self._reminder_task = None
+        self._reminder_loop = None
+        self._stop_event = asyncio.Event()
+        self._last_reminder_date = None
+        
+        # 指令分发表，处理函数统一签名 (message_parts, message_text, sender_id, is_adm)
+        self._cmd_table = {
+            "/yhm": self.handle_yhm_command,
+            "/续时": self.handle_extend_time_command,
+            "/查看到期时间": lambda message_parts, message_text, sender_id, is_adm: self.handle_check_expire_command(sender_id),
+            "/用户列表": self.handle_user_list_command,
+            "/帮助": self.handle_help_command,
+        }
         
-        logger.info(f"用户管理插件已初始化，管理员: {self.admins}")
+        logger.info("用户管理插件已初始化")
         
         # 启动提醒任务
         try:
-            asyncio.create_task(self.start_reminder_task())
+            self._reminder_task = asyncio.create_task(self.start_reminder_task())
+            self._reminder_loop = self._reminder_task.get_loop()
         except RuntimeError:
             # 如果没有运行的事件循环，稍后启动
             pass
     
+    @property
+    def config(self) -> Dict[str, Any]:
+        """当前配置（由UserManager按文件mtime缓存）"""
+        return self.user_manager.load_config()
+    
+    @property
+    def admins(self) -> List[str]:
+        """管理员列表"""
+        return self.config.get("admins", [])
+    
+    @property
+    def group_id(self) -> str:
+        """提醒消息发送的群号"""
+        return self.config.get("group_id", "")
+    
+    @property
+    def _admin_set(self) -> frozenset:
+        """管理员ID集合（字符串），配置未变化时复用"""
+        config = self.config
+        if config is not self._admin_set_config:
+            self._admin_set_cache = frozenset(str(admin) for admin in config.get("admins", []))
+            self._admin_set_config = config
+        return self._admin_set_cache
+    
     def is_admin(self, user_id: str) -> bool:
         """检查用户是否为管理员"""
-        return str(user_id) in [str(admin) for admin in self.admins]
+        return str(user_id) in self._admin_set
     
     def extract_at_user(self, message_text: str) -> Optional[str]:
         """从消息中提取@的用户ID"""
-        import re
-        
-        # 尝试匹配QQ的CQ码格式
-        cq_pattern = r'\[CQ:at,qq=(\d+)\]'
-        match = re.search(cq_pattern, message_text)
-        if match:
-            return match.group(1)
-        
-        # 尝试匹配其他可能的@格式
-        at_pattern = r'@(\d+)'
-        match = re.search(at_pattern, message_text)
-        if match:
-            return match.group(1)
-        
-        return None
+        # CQ码优先，避免把用户名中的@（如邮箱）误认为@用户；
+        # 绝大多数消息不含@，先用子串判断跳过正则
+        match = None
+        if '[CQ:' in message_text:
+            match = _CQ_AT.search(message_text)
+        if match is None and '@' in message_text:
+            match = _AT_NUM.search(message_text)
+        return match.group(1) if match else None
     
-    async def handle_yhm_command(self, message_parts: List[str], message_text: str, sender_id: str) -> str:
+    async def handle_yhm_command(self, message_parts: List[str], message_text: str, sender_id: str, is_adm: Optional[bool] = None) -> str:
         """处理设置用户名指令"""
-        if not self.is_admin(sender_id):
+        if is_adm is None:
+            is_adm = self.is_admin(sender_id)
+        if not is_adm:
             return "❌ 权限不足，仅管理员可使用此指令"
         
         if len(message_parts) < 2:
@@ -192,15 +470,17 @@ class UserManagementPlugin:
             return "❌ 请@目标用户"
         
         try:
-            user_info = self.user_manager.add_or_update_user(target_user_id, username=username)
+            user_info = await self.user_manager.aadd_or_update_user(target_user_id, username=username)
             return f"✅ 已为用户 @{target_user_id} 设置外部平台用户名：{username}"
         except Exception as e:
             logger.error(f"设置用户名失败: {e}")
             return f"❌ 设置失败: {str(e)}"
     
-    async def handle_extend_time_command(self, message_parts: List[str], message_text: str, sender_id: str) -> str:
+    async def handle_extend_time_command(self, message_parts: List[str], message_text: str, sender_id: str, is_adm: Optional[bool] = None) -> str:
         """处理续时指令"""
-        if not self.is_admin(sender_id):
+        if is_adm is None:
+            is_adm = self.is_admin(sender_id)
+        if not is_adm:
             return "❌ 权限不足，仅管理员可使用此指令"
         
         if len(message_parts) < 2:
@@ -219,7 +499,7 @@ class UserManagementPlugin:
             return "❌ 请@目标用户"
         
         try:
-            user_info = self.user_manager.add_or_update_user(target_user_id, extend_days=days)
+            user_info = await self.user_manager.aadd_or_update_user(target_user_id, extend_days=days)
             return f"✅ 已为用户 @{target_user_id} 延长服务时间 {days} 天\n新的到期时间：{user_info['expire_date']}"
         except Exception as e:
             logger.error(f"续时失败: {e}")
@@ -227,7 +507,8 @@ class UserManagementPlugin:
     
     async def handle_check_expire_command(self, sender_id: str) -> str:
         """处理查看到期时间指令"""
-        user_info = self.user_manager.get_user_info(str(sender_id))
+        users = await self.user_manager.aload_users()
+        user_info = users.get(str(sender_id))
         
         if not user_info:
             return "❌ 未找到您的服务记录，请联系管理员"
@@ -237,9 +518,7 @@ class UserManagementPlugin:
         username = user_info.get("platform_username", "未设置")
         
         try:
-            expire_datetime = datetime.strptime(expire_date, "%Y-%m-%d")
-            today = datetime.now()
-            days_left = (expire_datetime - today).days
+            days_left = (date.fromisoformat(expire_date) - date.today()).days
             
             if days_left > 0:
                 status_text = f"距离到期还有：{days_left} 天"
@@ -247,7 +526,7 @@ class UserManagementPlugin:
                 status_text = "今天到期"
             else:
                 status_text = f"已过期 {abs(days_left)} 天"
-        except ValueError:
+        except (TypeError, ValueError):
             status_text = "日期格式错误"
         
         response = f"""📊 您的服务状态：
@@ -270,55 +549,52 @@ class UserManagementPlugin:
         
         command = message_parts[0].lower()
         
-        # 处理各种指令
-        if command == "/yhm":
-            return await self.handle_yhm_command(message_parts, message_text, sender_id)
-        
-        elif command == "/续时":
-            return await self.handle_extend_time_command(message_parts, message_text, sender_id)
-        
-        elif command == "/查看到期时间":
-            return await self.handle_check_expire_command(sender_id)
-        
-        # 管理员专用指令
-        elif command == "/用户列表" and self.is_admin(sender_id):
-            return await self.get_user_list()
-        
-        elif command == "/帮助":
-            return self.get_help_text(sender_id)
-        
-        return None
+        handler = self._cmd_table.get(command)
+        if handler is None:
+            return None
+        is_adm = str(sender_id) in self._admin_set
+        return await handler(message_parts, message_text, sender_id, is_adm)
+    
+    async def handle_user_list_command(self, message_parts: List[str], message_text: str, sender_id: str, is_adm: bool) -> Optional[str]:
+        """处理用户列表指令（管理员专用，非管理员不响应）"""
+        if not is_adm:
+            return None
+        return await self.get_user_list()
+    
+    async def handle_help_command(self, message_parts: List[str], message_text: str, sender_id: str, is_adm: bool) -> str:
+        """处理帮助指令"""
+        return self.get_help_text(sender_id, is_adm)
     
     async def get_user_list(self) -> str:
         """获取用户列表（管理员专用）"""
-        users = self.user_manager.load_users()
+        users = await self.user_manager.aload_users()
         
         if not users:
             return "📋 当前没有用户记录"
         
-        response = "📋 用户列表：\n"
+        today_ordinal = date.today().toordinal()
+        parts = ["📋 用户列表："]
         for user_id, user_info in users.items():
             username = user_info.get("platform_username", "未设置")
             expire_date = user_info.get("expire_date", "未知")
             
-            try:
-                expire_datetime = datetime.strptime(expire_date, "%Y-%m-%d")
-                days_left = (expire_datetime - datetime.now()).days
-                
+            expire_ordinal = user_info.get("expire_ordinal")
+            if expire_ordinal is None:
+                status = "日期错误"
+            else:
+                days_left = expire_ordinal - today_ordinal
                 if days_left > 0:
                     status = f"剩余{days_left}天"
                 elif days_left == 0:
                     status = "今天到期"
                 else:
                     status = f"已过期{abs(days_left)}天"
-            except ValueError:
-                status = "日期错误"
             
-            response += f"\n👤 {user_id} ({username})\n   到期: {expire_date} ({status})\n"
+            parts.append(f"\n👤 {user_id} ({username})\n   到期: {expire_date} ({status})")
         
-        return response
+        return "\n".join(parts)
     
-    def get_help_text(self, sender_id: str) -> str:
+    def get_help_text(self, sender_id: str, is_adm: Optional[bool] = None) -> str:
         """获取帮助文本"""
         help_text = """📖 用户管理插件帮助
 
@@ -326,7 +602,9 @@ class UserManagementPlugin:
 /查看到期时间 - 查看自己的服务状态
 /帮助 - 显示此帮助信息"""
         
-        if self.is_admin(sender_id):
+        if is_adm is None:
+            is_adm = self.is_admin(sender_id)
+        if is_adm:
             help_text += """
 
 🔸 管理员指令：
@@ -338,30 +616,71 @@ class UserManagementPlugin:
     
     async def start_reminder_task(self):
         """启动提醒任务"""
-        if self.reminder_task_running:
+        current_task = asyncio.current_task()
+        # 已有提醒任务在运行时不再重复启动
+        if self._reminder_task is not None and self._reminder_task is not current_task and not self._reminder_task.done():
             return
         
+        self._reminder_task = current_task
+        self._reminder_loop = asyncio.get_running_loop()
+        self._stop_event.clear()
         self.reminder_task_running = True
         logger.info("启动自动提醒任务")
         
-        while self.reminder_task_running:
-            try:
-                await self.check_and_send_reminders()
-            except Exception as e:
-                logger.error(f"提醒任务执行出错: {e}")
-            
-            # 每天检查一次（24小时）
-            await asyncio.sleep(24 * 60 * 60)
+        try:
+            while not self._stop_event.is_set():
+                # 启动时若今天还没检查过则立即检查，之后每天检查一次
+                today = date.today()
+                if self._last_reminder_date != today:
+                    try:
+                        await self.check_and_send_reminders()
+                    except Exception as e:
+                        logger.error(f"提醒任务执行出错: {e}")
+                    self._last_reminder_date = today
+                
+                # 等待到下一次检查时间，收到停止信号时立即退出
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.seconds_until_next_reminder())
+                    break
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.reminder_task_running = False
+            if self._reminder_task is current_task:
+                self._reminder_task = None
+    
+    def seconds_until_next_reminder(self, now: Optional[datetime] = None) -> float:
+        """计算距离下一次提醒检查（每天00:05）的秒数"""
+        now = now or datetime.now()
+        target = now.replace(hour=0, minute=5, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return (target - now).total_seconds()
     
     async def check_and_send_reminders(self):
         """检查并发送提醒"""
-        config = self.user_manager.load_config()
+        config = self.config
         
         if not config.get("reminder_enabled", True):
             return
         
-        # 检查即将到期的用户（3天前提醒）
-        expiring_users_3days = self.user_manager.get_expiring_users(3)
+        # 先在线程中加载用户数据，后续索引查询直接命中缓存
+        await self.user_manager.aload_users()
+        
+        # 通过到期日期索引直接取出需要提醒的用户
+        today = date.today()
+        three_days_date = (today + timedelta(days=3)).isoformat()
+        today_date = today.isoformat()
+        expired_date = (today - timedelta(days=1)).isoformat()
+        
+        expiring_users_3days = self.user_manager.get_users_by_expire_date(three_days_date)
+        expiring_users_today = self.user_manager.get_users_by_expire_date(today_date)
+        expired_users = self.user_manager.get_users_by_expire_date(expired_date)
+        
+        group_tasks = []
+        private_tasks = []
+        
+        # 即将到期的用户（3天前提醒）
         for user_id, user_info in expiring_users_3days:
             username = user_info.get("platform_username", "")
             message = f"⚠️ @{user_id} 您的服务将在3天后（{user_info['expire_date']}）到期，请及时续期！"
@@ -369,10 +688,9 @@ class UserManagementPlugin:
                 message += f"\n用户名：{username}"
             
             logger.info(f"发送3天到期提醒: {user_id}")
-            await self.send_group_message(message)
+            group_tasks.append(self.send_group_message(message))
         
-        # 检查当天到期的用户
-        expiring_users_today = self.user_manager.get_expiring_users(0)
+        # 当天到期的用户
         for user_id, user_info in expiring_users_today:
             username = user_info.get("platform_username", "")
             message = f"🚨 @{user_id} 您的服务今天到期（{user_info['expire_date']}），这是最后提醒！"
@@ -380,18 +698,23 @@ class UserManagementPlugin:
                 message += f"\n用户名：{username}"
             
             logger.info(f"发送当天到期提醒: {user_id}")
-            await self.send_group_message(message)
+            group_tasks.append(self.send_group_message(message))
         
-        # 检查已过期的用户，通知管理员
-        expired_users = self.user_manager.get_expired_users(1)
+        # 已过期的用户，通知管理员
         for user_id, user_info in expired_users:
             username = user_info.get("platform_username", "未设置")
             message = f"🔴 管理员提醒：用户 @{user_id} (用户名: {username}) 的服务已于 {user_info['expire_date']} 到期，请及时进行关停操作。"
             
             # 私聊通知所有管理员
-            for admin_id in self.admins:
+            for admin_id in config.get("admins", []):
                 logger.info(f"发送过期通知给管理员: {admin_id}")
-                await self.send_private_message(admin_id, message)
+                private_tasks.append(self.send_private_message(admin_id, message))
+        
+        # 并发发送，单条失败不影响其他消息
+        results = await asyncio.gather(*group_tasks, *private_tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"发送提醒失败: {result}")
     
     async def send_group_message(self, message: str):
         """发送群消息"""
@@ -414,8 +737,28 @@ class UserManagementPlugin:
             logger.info(f"私聊消息给 {user_id}: {message}")
     
     def stop_reminder_task(self):
-        """停止提醒任务"""
+        """停止提醒任务（可在事件循环外或其他线程中调用）"""
         self.reminder_task_running = False
+        try:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            
+            task = self._reminder_task
+            loop = self._reminder_loop
+            if loop is None or loop is running_loop or loop.is_closed():
+                self._stop_event.set()
+                # 任务可能尚未开始执行，直接取消以免启动时清除停止信号
+                if task is not None and running_loop is not None and task is not asyncio.current_task():
+                    task.cancel()
+            else:
+                # 在其他线程中调用时交给事件循环线程执行
+                loop.call_soon_threadsafe(self._stop_event.set)
+                if task is not None:
+                    loop.call_soon_threadsafe(task.cancel)
+        finally:
+            self.user_manager.flush()
         logger.info("停止自动提醒任务")
     
     # AstrBot插件系统可能需要的方法
@@ -453,35 +796,46 @@ class UserManagementPlugin:
         users_data = self.user_manager.load_users()
         config_data = self.user_manager.load_config()
         
+        today_ordinal = date.today().toordinal()
+        active_users = sum(1 for u in users_data.values() if u.get("expire_ordinal", 0) > today_ordinal)
+        
+        # 返回副本，避免界面层修改内部缓存
         return {
-            "users_json": json.dumps(users_data, ensure_ascii=False, indent=2),
-            "config": config_data,
+            "users": self.user_manager.get_users_snapshot(),
+            "config": dict(config_data),
             "stats": {
                 "total_users": len(users_data),
-                "active_users": len([u for u in users_data.values() 
-                                   if datetime.strptime(u.get("expire_date", "1970-01-01"), "%Y-%m-%d") > datetime.now()]),
-                "expired_users": len([u for u in users_data.values() 
-                                    if datetime.strptime(u.get("expire_date", "1970-01-01"), "%Y-%m-%d") <= datetime.now()])
+                "active_users": active_users,
+                "expired_users": len(users_data) - active_users
             }
         }
     
+    def export_users_json(self) -> str:
+        """导出用户数据为格式化的JSON字符串（供设置界面下载）"""
+        users_data = self.user_manager.get_users_snapshot()
+        return json.dumps(users_data, ensure_ascii=False, indent=2)
+    
     def save_settings(self, settings_data: Dict[str, Any]) -> Dict[str, Any]:
         """保存设置"""
         try:
-            # 保存用户数据
-            if "users_json" in settings_data:
+            # 保存用户数据（兼容旧版以JSON字符串提交的users_json）
+            users_data = None
+            if "users" in settings_data:
+                users_data = settings_data["users"]
+            elif "users_json" in settings_data:
                 users_data = json.loads(settings_data["users_json"])
+            
+            if users_data is not None:
+                if not isinstance(users_data, dict) or not all(isinstance(u, dict) for u in users_data.values()):
+                    return {"success": False, "message": "用户数据格式错误"}
+                # 复制一份再补齐字段，不修改调用方传入的数据
+                users_data = {user_id: dict(user_info) for user_id, user_info in users_data.items()}
+                self.user_manager.sync_expire_ordinals(users_data)
                 self.user_manager.save_users(users_data)
             
             # 保存配置
             if "config" in settings_data:
-                config = settings_data["config"]
-                self.user_manager.save_config(config)
-                
-                # 更新内存中的配置
-                self.config = config
-                self.admins = config.get("admins", [])
-                self.group_id = config.get("group_id", "")
+                self.user_manager.save_config(dict(settings_data["config"]))
             
             return {"success": True, "message": "设置保存成功"}
         